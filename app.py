@@ -1,19 +1,38 @@
-from flask import Flask, render_template, request, flash, redirect, url_for
-import plotly.express as px
-import plotly.graph_objects as go
-from plotly.subplots import make_subplots
+from quart import Quart, render_template, request, flash, redirect, url_for, jsonify, Response, session, make_response
+from quart.wrappers.response import DataBody
 import pandas as pd
 import datetime
-import requests
+import asyncio
 import os
+import io
+import gzip
+import time
+import hashlib
+import glob
 import logging
 from concurrent.futures import ThreadPoolExecutor
 import optionchain
+import charts
+import upstream
+
+# Arrow IPC export is optional
+try:
+    import pyarrow as pa
+    ARROW_AVAILABLE = True
+except ImportError:
+    ARROW_AVAILABLE = False
+
+# Brotli response compression is optional (gzip is always available)
+try:
+    import brotli
+    BROTLI_AVAILABLE = True
+except ImportError:
+    BROTLI_AVAILABLE = False
 
 # ====================================================
-# 🌐 Flask App Setup
+# 🌐 Quart App Setup (ASGI)
 # ====================================================
-app = Flask(__name__)
+app = Quart(__name__)
 app.secret_key = os.getenv("SECRET_KEY", "super_secret_key_123")
 
 # Configure logging (StreamHandler only for Vercel compatibility)
@@ -33,11 +52,25 @@ NSE_HOME_URL = "https://www.nseindia.com"
 # In-memory cache for CSV data (Vercel-compatible)
 _csv_cache = {}
 
+# Dates whose CSV was not (yet) published, with the time of the last attempt
+_csv_missing = {}
+MISSING_CSV_TTL = 600
+
+# Trading days fetched up front by the async dashboard (5-day trend + activity lookback)
+PREFETCH_TRADING_DAYS = 7
+
+# In-memory cache of rendered dashboard charts (keyed by data dates)
+_chart_cache = {}
+
 # Helper function to detect Vercel environment
 def is_vercel():
     """Check if running on Vercel."""
     return os.getenv('VERCEL') == '1' or os.getenv('VERCEL_ENV') is not None
 
+# Chart rendering: "serial" by default, "process" renders across a pre-warmed
+# process pool (multi-core hosts only; Vercel functions always render serially)
+CHART_RENDER_MODE = "serial" if is_vercel() else os.getenv("CHART_RENDER_MODE", "serial")
+
 # Predefined NSE holidays
 NSE_HOLIDAYS = {
     datetime.date(2025, m, d) for (m, d) in [
@@ -62,46 +95,75 @@ def adjust_for_holidays(date: datetime.date) -> datetime.date:
         date -= datetime.timedelta(days=1)
     return date
 
-def download_csv(date: datetime.date) -> str:
-    """Download NSE OI CSV file for a given date and cache in memory."""
+CSV_HEADERS = {
+    "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64)",
+    "Referer": "https://www.nseindia.com"
+}
+
+def is_unpublished(date_str: str) -> bool:
+    """Whether NSE answered 'not published' (4xx) for this date within MISSING_CSV_TTL."""
+    return time.time() - _csv_missing.get(date_str, 0) < MISSING_CSV_TTL
+
+async def download_csv(date: datetime.date, cache: bool = True) -> str:
+    """
+    Download NSE OI CSV file for a given date and cache in memory.
+    With cache=False the in-memory cache is read but not filled (bulk exports).
+    """
     date_str = get_date_string(date)
     
     # Check in-memory cache first
     if date_str in _csv_cache:
         return _csv_cache[date_str]
+    if is_unpublished(date_str):
+        return None
+
+    csv_content = await upstream.coalesce(("participant-oi", date_str), lambda: fetch_csv(date_str))
+    if csv_content and cache:
+        # Store in memory cache
+        _csv_cache[date_str] = csv_content
+    return csv_content
 
+async def fetch_csv(date_str: str) -> str:
+    """Fetch one CSV from NSE archives, recording 'not published' answers."""
     url = BASE_URL.format(date_str)
-    headers = {
-        "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64)",
-        "Referer": "https://www.nseindia.com"
-    }
 
     logging.info(f"Downloading CSV: {url}")
-    try:
-        response = requests.get(url, headers=headers, timeout=10)
-        if response.ok:
-            # Store in memory cache
-            _csv_cache[date_str] = response.text
-            logging.info(f"✅ Downloaded and cached data for {date_str}")
-            return response.text
-        else:
-            logging.warning(f"Failed to download {url}: {response.status_code}")
-            return None
-    except Exception as e:
-        logging.error(f"Error downloading {url}: {e}")
+    response = await upstream.get(url, headers=CSV_HEADERS)
+    if response is None:
         return None
+    if response.is_success:
+        logging.info(f"✅ Downloaded data for {date_str}")
+        return response.text
+    logging.warning(f"Failed to download {url}: {response.status_code}")
+    # 4xx means not published (yet); server errors are retried
+    if response.status_code < 500:
+        _csv_missing[date_str] = time.time()
+    return None
+
+async def prefetch_participant_oi(end_date: datetime.date, n: int = PREFETCH_TRADING_DAYS):
+    """Download the last n trading days' CSVs concurrently into the in-memory cache."""
+    dates = []
+    current_date = end_date
+    while len(dates) < n:
+        current_date = adjust_for_holidays(current_date)
+        dates.append(current_date)
+        current_date -= datetime.timedelta(days=1)
+    await asyncio.gather(*(download_csv(d) for d in dates))
 
 
 
 # ====================================================
 # 📊 Data Processing Functions
 # ====================================================
-def load_data(date: datetime.date) -> pd.DataFrame:
-    """Load OI data for a single date from memory cache."""
-    csv_content = download_csv(date)
+async def load_data(date: datetime.date) -> pd.DataFrame:
+    """Load OI data for a single date: download awaited, parsing in a worker thread."""
+    csv_content = await download_csv(date)
     if not csv_content:
         return None
-    
+    return await asyncio.to_thread(parse_csv, csv_content)
+
+def parse_csv(csv_content: str) -> pd.DataFrame:
+    """Parse one participant OI CSV into a DataFrame."""
     # Base columns (always present)
     base_cols = [
         "Client Type", "Future Index Long", "Future Index Short",
@@ -129,14 +191,14 @@ def load_data(date: datetime.date) -> pd.DataFrame:
     
     return df.dropna()
 
-def fetch_last_n_days_data(end_date: datetime.date, n: int = 5) -> dict:
+async def fetch_last_n_days_data(end_date: datetime.date, n: int = 5) -> dict:
     """Fetch data for the last n trading days."""
     data_map = {}
     current_date = end_date
     count = 0
     while count < n:
         current_date = adjust_for_holidays(current_date)
-        df = load_data(current_date)
+        df = await load_data(current_date)
         if df is not None:
             data_map[current_date] = df
             count += 1
@@ -153,7 +215,7 @@ def calculate_net_sentiment(df):
 # ====================================================
 # 📊 Activity Table Logic
 # ====================================================
-def get_latest_activity_data():
+async def get_latest_activity_data():
     """
     Finds the latest available data date and the previous trading day.
     Calculates Day-over-Day change in Net OI.
@@ -169,7 +231,7 @@ def get_latest_activity_data():
         curr_date = adjust_for_holidays(curr_date)
         
         # Try to load data
-        curr_df = load_data(curr_date)
+        curr_df = await load_data(curr_date)
         if curr_df is not None and not curr_df.empty:
             break # Found valid data!
         
@@ -186,7 +248,7 @@ def get_latest_activity_data():
     attempts = 0
     while attempts < 10:
         prev_date = adjust_for_holidays(prev_date)
-        prev_df = load_data(prev_date)
+        prev_df = await load_data(prev_date)
         if prev_df is not None and not prev_df.empty:
             break
         prev_date -= datetime.timedelta(days=1)
@@ -195,6 +257,10 @@ def get_latest_activity_data():
     if prev_df is None:
         return None # Can't calculate change without previous data
 
+    return await asyncio.to_thread(build_activity_data, curr_date, curr_df, prev_df)
+
+def build_activity_data(curr_date: datetime.date, curr_df, prev_df) -> dict:
+    """Day-over-Day participant activity table from two days of OI data."""
     # 3. Calculate Changes
     # Helper to get Net OI
     def get_net(df, client, type_long, type_short):
@@ -295,195 +361,251 @@ def get_latest_activity_data():
 # ====================================================
 # 📈 Chart Generation (Advanced)
 # ====================================================
-def generate_advanced_charts(current_date: datetime.date):
-    """Generate all charts for the 7-step analysis. Returns dict of HTML strings."""
+async def generate_advanced_charts(current_date: datetime.date, render_mode: str = CHART_RENDER_MODE):
+    """Generate the dashboard's Market Snapshot charts. Returns dict of HTML strings."""
     
-    # 1. Fetch Data (Current vs Previous for Change, and Last 5 Days for Trend)
-    data_map = fetch_last_n_days_data(current_date, n=5)
+    # 1. Fetch the latest available day (the snapshot only charts one day)
+    data_map = await fetch_last_n_days_data(current_date, n=1)
     sorted_dates = sorted(data_map.keys())
     
     if len(sorted_dates) < 1:
         raise Exception("Not enough data available.")
-        
-    today_df = data_map[sorted_dates[-1]].copy()
-    today_df = calculate_net_sentiment(today_df)
-    
-    prev_df = data_map[sorted_dates[-2]].copy() if len(sorted_dates) >= 2 else today_df
-    
-    # Common Layout Settings
-    layout_args = dict(
-        paper_bgcolor="rgba(0,0,0,0)",
-        plot_bgcolor="rgba(0,0,0,0)",
-        font_color="#888",
-        margin=dict(l=20, r=20, t=40, b=20)
-    )
 
-    charts = {}
-
-    # --- Step 1: Data Preparation and Overview ---
-    # Bar Chart: Raw Values
-    fig_raw = go.Figure()
-    for col in ["Option Index Call Long", "Option Index Put Long"]:
-        fig_raw.add_trace(go.Bar(x=today_df["Client Type"], y=today_df[col], name=col))
-    fig_raw.update_layout(title="Raw Call vs Put OI", barmode='group', **layout_args)
-    charts['step1_raw'] = fig_raw.to_html(include_plotlyjs='cdn', full_html=False)
-
-    # Donut Chart: Share of Total OI
-    total_oi = today_df[["Option Index Call Long", "Option Index Put Long"]].sum(axis=1)
-    fig_donut = px.pie(values=total_oi, names=today_df["Client Type"], title="Participant Market Share", hole=0.4)
-    fig_donut.update_layout(**layout_args)
-    charts['step1_donut'] = fig_donut.to_html(include_plotlyjs='cdn', full_html=False)
-
-    # --- Step 2: Call-Put Difference Analysis ---
-    # Horizontal Bar: Net Diff
-    fig_hbar = px.bar(today_df, x="Net Sentiment", y="Client Type", orientation='h', 
-                      title="Net Sentiment (Call Diff - Put Diff)", color="Net Sentiment",
-                      color_continuous_scale=px.colors.diverging.RdBu)
-    fig_hbar.update_layout(**layout_args)
-    charts['step2_hbar'] = fig_hbar.to_html(include_plotlyjs='cdn', full_html=False)
-
-    # Stacked Bar: Call Diff vs Put Diff
-    fig_stack = go.Figure()
-    fig_stack.add_trace(go.Bar(x=today_df["Client Type"], y=today_df["Call Diff"], name="Net Call"))
-    fig_stack.add_trace(go.Bar(x=today_df["Client Type"], y=today_df["Put Diff"], name="Net Put"))
-    fig_stack.update_layout(title="Net Call vs Net Put Exposure", barmode='relative', **layout_args)
-    charts['step2_stack'] = fig_stack.to_html(include_plotlyjs='cdn', full_html=False)
-
-    # --- Step 3: Total Market Call-Put Difference ---
-    # Column Chart
-    total_calls = today_df["Option Index Call Long"].sum()
-    total_puts = today_df["Option Index Put Long"].sum()
-    fig_mkt = go.Figure(data=[go.Bar(x=["Total Calls", "Total Puts"], y=[total_calls, total_puts], 
-                                     marker_color=['#10B981', '#EF4444'])])
-    fig_mkt.update_layout(title="Total Market Open Interest", **layout_args)
-    charts['step3_col'] = fig_mkt.to_html(include_plotlyjs='cdn', full_html=False)
-
-    # --- Step 4: FII & Pro Specific ---
-    # Radar Chart
-    categories = ["Future Index Long", "Future Index Short", "Option Index Call Long", "Option Index Put Long"]
-    fig_radar = go.Figure()
-    for client in ["FII", "PRO"]:
-        client_data = today_df[today_df["Client Type"] == client]
-        if not client_data.empty:
-            values = client_data[categories].values.flatten().tolist()
-            fig_radar.add_trace(go.Scatterpolar(r=values, theta=categories, fill='toself', name=client))
-    fig_radar.update_layout(title="FII vs PRO Positioning", polar=dict(radialaxis=dict(visible=True)), **layout_args)
-    charts['step4_radar'] = fig_radar.to_html(include_plotlyjs='cdn', full_html=False)
-
-    # --- Step 5: Trend Analysis Over Time ---
-    # Line Chart
-    trend_data = []
-    for d in sorted_dates:
-        day_df = calculate_net_sentiment(data_map[d].copy())
-        for client in ["FII", "PRO", "Client", "DII"]:
-            row = day_df[day_df["Client Type"] == client]
-            if not row.empty:
-                trend_data.append({
-                    "Date": d, 
-                    "Client": client, 
-                    "Net Sentiment": row["Net Sentiment"].values[0]
-                })
-    
-    trend_df = pd.DataFrame(trend_data)
-    fig_trend = px.line(trend_df, x="Date", y="Net Sentiment", color="Client", markers=True, title="5-Day Net Sentiment Trend")
-    fig_trend.update_layout(**layout_args)
-    charts['step5_trend'] = fig_trend.to_html(include_plotlyjs='cdn', full_html=False)
-
-    # --- Step 6: Advanced Combinational Visualization ---
-    # Scatter Plot: Net Sentiment vs Change in OI
-    # Calculate change from yesterday
-    merged = pd.merge(today_df, prev_df, on="Client Type", suffixes=("", "_prev"))
-    merged["OI Change"] = (merged["Option Index Call Long"] + merged["Option Index Put Long"]) - \
-                          (merged["Option Index Call Long_prev"] + merged["Option Index Put Long_prev"])
-    
-    fig_scatter = px.scatter(merged, x="Net Sentiment", y="OI Change", color="Client Type", size="Option Index Call Long",
-                             title="Sentiment vs OI Change", hover_data=["Client Type"])
-    fig_scatter.add_vline(x=0, line_dash="dash", line_color="gray")
-    fig_scatter.add_hline(y=0, line_dash="dash", line_color="gray")
-    fig_scatter.update_layout(**layout_args)
-    charts['step6_scatter'] = fig_scatter.to_html(include_plotlyjs='cdn', full_html=False)
-
-    # Heatmap: Participant vs Position Type Intensity
-    # Normalize data for heatmap
-    heatmap_data = today_df.set_index("Client Type")[["Future Index Long", "Future Index Short", "Option Index Call Long", "Option Index Put Long"]]
-    fig_heat = px.imshow(heatmap_data, text_auto=True, aspect="auto", title="Position Intensity Heatmap",
-                         color_continuous_scale="Viridis")
-    fig_heat.update_layout(**layout_args)
-    charts['step6_heat'] = fig_heat.to_html(include_plotlyjs='cdn', full_html=False)
-
-    # --- Step 8: Requested Custom Tables & Charts ---
-    # Prepare Data with TOTAL row
-    step8_df = today_df.copy()
-    numeric_cols = step8_df.select_dtypes(include='number').columns
-    total_row = step8_df[numeric_cols].sum()
-    total_row["Client Type"] = "TOTAL"
-    step8_df = pd.concat([step8_df, pd.DataFrame([total_row])], ignore_index=True)
-
-    # Helper for Color Formatting (Green/Red)
-    def get_colors(values):
-        return ['#86efac' if v >= 0 else '#fca5a5' for v in values] # Light Green / Light Red
-
-    # 1. Table: Call Diff vs Put Diff
-    fig_tbl1 = go.Figure(data=[go.Table(
-        header=dict(values=["Client Type", "Call Diff (Long-Short)", "Put Diff (Long-Short)"],
-                    fill_color='#d1d5db', align='center', font=dict(color='black', size=12)),
-        cells=dict(values=[step8_df["Client Type"], step8_df["Call Diff"], step8_df["Put Diff"]],
-                   fill_color=[['#f3f4f6']*len(step8_df), get_colors(step8_df["Call Diff"]), get_colors(step8_df["Put Diff"])],
-                   align='center', font=dict(color='black', size=11))
-    )])
-    fig_tbl1.update_layout(title="Call & Put Diff per Client", margin=dict(l=0, r=0, t=30, b=0))
-    charts['step8_table1'] = fig_tbl1.to_html(include_plotlyjs='cdn', full_html=False)
-
-    # 2. Table: Net Sentiment
-    fig_tbl2 = go.Figure(data=[go.Table(
-        header=dict(values=["Client Type", "Call-Put Diff (Call-Put)"],
-                    fill_color='#d1d5db', align='center', font=dict(color='black', size=12)),
-        cells=dict(values=[step8_df["Client Type"], step8_df["Net Sentiment"]],
-                   fill_color=[['#f3f4f6']*len(step8_df), get_colors(step8_df["Net Sentiment"])],
-                   align='center', font=dict(color='black', size=11))
-    )])
-    fig_tbl2.update_layout(title="Net Sentiment Diff", margin=dict(l=0, r=0, t=30, b=0))
-    charts['step8_table2'] = fig_tbl2.to_html(include_plotlyjs='cdn', full_html=False)
-
-    # 3. Charts: Side-by-Side Diff Bars
-    fig_sb = make_subplots(rows=1, cols=2, subplot_titles=("Call Diff", "Put Diff"))
-    
-    # Call Diff Bar
-    colors_call = ['#059669' if v >= 0 else '#dc2626' for v in step8_df["Call Diff"]]
-    fig_sb.add_trace(go.Bar(x=step8_df["Client Type"], y=step8_df["Call Diff"], marker_color=colors_call, name="Call Diff"), row=1, col=1)
-    
-    # Put Diff Bar
-    colors_put = ['#059669' if v >= 0 else '#dc2626' for v in step8_df["Put Diff"]]
-    fig_sb.add_trace(go.Bar(x=step8_df["Client Type"], y=step8_df["Put Diff"], marker_color=colors_put, name="Put Diff"), row=1, col=2)
-
-    fig_sb.update_layout(title="Call & Put Diff per Client Type", showlegend=False, **layout_args)
-    charts['step8_charts'] = fig_sb.to_html(include_plotlyjs='cdn', full_html=False)
-
-    # ============================================
-    # 6. Position Intensity Heatmap (Moved from Compare)
-    # ============================================
-    heatmap_data = today_df.set_index("Client Type")[["Future Index Long", "Future Index Short", 
-                                                        "Option Index Call Long", "Option Index Put Long"]]
-    
-    fig_heat = go.Figure(data=go.Heatmap(
-        z=heatmap_data.values,
-        x=heatmap_data.columns,
-        y=heatmap_data.index,
-        colorscale='Viridis',
-        text=heatmap_data.values,
-        texttemplate='%{text:,.0f}',
-        textfont={"size": 12},
-        colorbar=dict(title="OI Value")
-    ))
-    
-    fig_heat.update_layout(
-        title=dict(text="Position Intensity Heatmap", font=dict(size=20, color='#3b82f6')),
-        **layout_args,
-        height=500
+    # Past participant OI never changes, so the dates identify the render
+    cache_key = tuple(sorted_dates)
+    if cache_key in _chart_cache:
+        return _chart_cache[cache_key]
+
+    # Frame prep and Plotly rendering are CPU-bound: keep them off the event loop
+    rendered = await asyncio.to_thread(render_snapshot_charts, data_map[sorted_dates[-1]], render_mode)
+
+    _chart_cache.clear()
+    _chart_cache[cache_key] = rendered
+    return rendered
+
+def render_snapshot_charts(latest_df, render_mode: str = CHART_RENDER_MODE) -> dict:
+    """Build the snapshot's input frames and render its charts."""
+    today_df = calculate_net_sentiment(latest_df.copy())
+    return charts.render_charts(charts.snapshot_jobs(today_df), mode=render_mode)
+
+# ====================================================
+# 📤 Bulk Export Logic
+# ====================================================
+EXPORT_FORMATS = {
+    "csv": "text/csv",
+    "ndjson": "application/x-ndjson",
+    "arrow": "application/vnd.apache.arrow.stream",
+}
+EXPORT_COLUMNS = [
+    "Date", "Client Type", "Future Index Long", "Future Index Short",
+    "Future Stock Long", "Future Stock Short",
+    "Option Index Call Long", "Option Index Put Long",
+    "Option Index Call Short", "Option Index Put Short",
+    "Call Diff", "Put Diff", "Net Sentiment"
+]
+MAX_EXPORT_DAYS = 366
+DEFAULT_EXPORT_DAYS = 30
+
+def iter_trading_days(start: datetime.date, end: datetime.date):
+    """Yield weekdays between start and end (inclusive) that are not NSE holidays."""
+    current_date = start
+    while current_date <= end:
+        if current_date.weekday() <= 4 and current_date not in NSE_HOLIDAYS:
+            yield current_date
+        current_date += datetime.timedelta(days=1)
+
+async def download_export_csv(day: datetime.date) -> str:
+    """
+    CSV for one export day, without filling the dashboard's cache so memory
+    stays flat across ranges. Returns None if NSE has not published the day and
+    raises RuntimeError if it could not be fetched for any other reason.
+    """
+    csv_content = await download_csv(day, cache=False)
+    if csv_content is None and not is_unpublished(get_date_string(day)):
+        raise RuntimeError(f"Participant OI for {day.isoformat()} could not be fetched")
+    return csv_content
+
+async def latest_published_day(start: datetime.date, end: datetime.date):
+    """
+    Latest trading day in range that NSE has published, probing back from the
+    end of the range (normally one or two downloads). None if there is none.
+    """
+    days = list(iter_trading_days(start, min(end, datetime.date.today())))
+    for day in reversed(days):
+        if await download_export_csv(day):
+            return day
+    return None
+
+async def iter_participant_oi(start: datetime.date, end: datetime.date):
+    """Yield one parsed participant OI frame (with derived columns) per published day."""
+    for day in iter_trading_days(start, end):
+        csv_content = await download_export_csv(day)
+        if csv_content is None:
+            continue
+        df = await asyncio.to_thread(parse_csv, csv_content)
+        if df is None:
+            # Abort the stream rather than silently dropping a day the ETag covers
+            raise RuntimeError(f"Participant OI for {day.isoformat()} could not be parsed")
+        df = calculate_net_sentiment(df)
+        df["Date"] = day.isoformat()
+        yield df[EXPORT_COLUMNS]
+
+async def stream_csv(frames):
+    header = True
+    async for df in frames:
+        yield df.to_csv(index=False, header=header)
+        header = False
+
+async def stream_ndjson(frames):
+    async for df in frames:
+        yield df.to_json(orient="records", lines=True).rstrip("\n") + "\n"
+
+async def stream_arrow(frames):
+    """Arrow IPC stream: one record batch per trading day."""
+    schema = pa.schema(
+        [("Date", pa.string()), ("Client Type", pa.string())] +
+        [(col, pa.int64()) for col in EXPORT_COLUMNS[2:]]
     )
-    charts['position_heat'] = fig_heat.to_html(include_plotlyjs='cdn', full_html=False)
+    sink = io.BytesIO()
+    writer = pa.ipc.new_stream(sink, schema)
+    async for df in frames:
+        writer.write_batch(pa.RecordBatch.from_pandas(df, schema=schema, preserve_index=False))
+        # Hand each batch to the client and drop it from the buffer
+        yield sink.getvalue()
+        sink.seek(0)
+        sink.truncate()
+    writer.close()
+    yield sink.getvalue()
+
+EXPORT_STREAMS = {"csv": stream_csv, "ndjson": stream_ndjson, "arrow": stream_arrow}
+
+def export_etag(fmt: str, start: datetime.date, end: datetime.date, last_day) -> str:
+    """
+    Validator for an export range. Past participant OI never changes, so the
+    body is fixed by the latest published day; the next published day changes it.
+    Days that fail to download abort the stream instead of being left out.
+    """
+    key = f"{fmt}:{start.isoformat()}:{end.isoformat()}:{last_day.isoformat() if last_day else None}"
+    return hashlib.sha1(key.encode()).hexdigest()
+
+def parse_dates_range(header: str, start: datetime.date, end: datetime.date):
+    """
+    Parse a 'Range: dates=YYYY-MM-DD/YYYY-MM-DD' header (either bound optional)
+    and clamp it to [start, end]. Returns None if the header is not a dates range.
+    """
+    if not header or not header.startswith("dates="):
+        return None
+    try:
+        lower, _, upper = header[len("dates="):].partition("/")
+        range_start = datetime.date.fromisoformat(lower) if lower else start
+        range_end = datetime.date.fromisoformat(upper) if upper else end
+    except ValueError:
+        return None
+    return max(start, range_start), min(end, range_end)
+
+# ====================================================
+# 🗄️ HTTP Caching & Compression
+# ====================================================
+IST = datetime.timezone(datetime.timedelta(hours=5, minutes=30))
+OPTION_CHAIN_CACHE_CONTROL = "public, max-age=15, s-maxage=15, stale-while-revalidate=30"
+COMPRESSIBLE_MIMETYPES = {"text/html", "text/csv", "text/plain", "application/json", "application/x-ndjson"}
+COMPRESS_MIN_SIZE = 500
+
+def compute_etag_salt() -> str:
+    """
+    Version of the page-rendering code, so cached pages don't outlive a deploy.
+    Uses the deployed commit when known, else a hash of the templates and
+    Python sources, which is the same in every worker process.
+    """
+    commit = os.getenv("VERCEL_GIT_COMMIT_SHA")
+    if commit:
+        return commit
+    base_dir = os.path.dirname(os.path.abspath(__file__))
+    digest = hashlib.sha1()
+    for pattern in ("templates/*.html", "*.py"):
+        for path in sorted(glob.glob(os.path.join(base_dir, pattern))):
+            with open(path, "rb") as f:
+                digest.update(f.read())
+    return digest.hexdigest()
+
+_etag_salt = compute_etag_salt()
+
+def make_etag(*parts) -> str:
+    return hashlib.sha1("|".join([_etag_salt, *map(str, parts)]).encode()).hexdigest()
+
+def is_fresh(etag, last_modified) -> bool:
+    """
+    Whether the client's cached copy is current. If-None-Match (weak comparison)
+    takes precedence over If-Modified-Since, as in RFC 9110.
+    """
+    if request.if_none_match:
+        return request.if_none_match.contains_weak(etag)
+    since = request.if_modified_since
+    return bool(since and last_modified and last_modified.replace(microsecond=0) <= since)
+
+async def cached_page(etag, last_modified, cache_control, render):
+    """
+    Serve await render() with validators and cache headers, or 304 if the client's copy is current.
+    Pages carrying flash messages are per-user, so they bypass caching entirely.
+    """
+    if session.get("_flashes") or request.method not in ("GET", "HEAD"):
+        response = await make_response(await render())
+        response.headers["Cache-Control"] = "no-store"
+        return response
+
+    if is_fresh(etag, last_modified):
+        response = Response(status=304)
+    else:
+        response = await make_response(await render())
+    # Weak, since the body may be re-encoded by compress_response
+    response.set_etag(etag, weak=True)
+    if last_modified:
+        response.last_modified = last_modified
+    response.headers["Cache-Control"] = cache_control
+    return response
+
+def parse_snapshot_time(snapshot_id):
+    """NSE option chain timestamp ('17-Oct-2025 15:30:00', IST) as an aware datetime."""
+    try:
+        return datetime.datetime.strptime(snapshot_id, "%d-%b-%Y %H:%M:%S").replace(tzinfo=IST)
+    except (TypeError, ValueError):
+        return None
 
-    return charts
+@app.after_request
+async def compress_response(response):
+    """Brotli/gzip-compress text responses according to Accept-Encoding."""
+    # Streamed bodies (exports) are left as they are
+    if (response.mimetype not in COMPRESSIBLE_MIMETYPES or not isinstance(response.response, DataBody)
+            or "Content-Encoding" in response.headers
+            or not 200 <= response.status_code < 300):
+        return response
+
+    response.vary.add("Accept-Encoding")
+    encoding = request.accept_encodings.best_match(["br", "gzip"] if BROTLI_AVAILABLE else ["gzip"])
+    data = await response.get_data()
+    if not encoding or len(data) < COMPRESS_MIN_SIZE:
+        return response
+
+    if encoding == "br":
+        response.set_data(brotli.compress(data, quality=5))
+    else:
+        response.set_data(gzip.compress(data, compresslevel=6))
+    response.headers["Content-Encoding"] = encoding
+
+    etag, weak = response.get_etag()
+    if etag and not weak:
+        response.set_etag(etag, weak=True)
+    return response
+
+@app.before_serving
+async def warm_chart_pool():
+    if CHART_RENDER_MODE == "process":
+        await asyncio.to_thread(charts.warm_render_pool, charts.SNAPSHOT_CHARTS)
+
+@app.after_serving
+async def release_shared_resources():
+    await upstream.close_client()
+    charts.shutdown_render_pool()
 
 # ====================================================
 # ⛓️ Option Chain Logic
@@ -491,45 +613,152 @@ def generate_advanced_charts(current_date: datetime.date):
 
 
 # ====================================================
-# 🌍 Flask Routes
+# 🌍 Routes
 # ====================================================
 @app.route("/", methods=["GET", "POST"])
-def index():
+async def index():
     # Simplified Index for Dashboard
-    charts = None
+    chart_html = None
     activity_data = None
+    chain_summary = None
+    
+    # Auto-load latest available data
+    today = datetime.date.today()
+    target_date = adjust_for_holidays(today)
+
+    # Fetch participant OI CSVs and the option chain concurrently
+    prefetch, chain = await asyncio.gather(
+        prefetch_participant_oi(target_date),
+        optionchain.get_option_chain_data(track_changes=False),
+        return_exceptions=True
+    )
+    for result in (prefetch, chain):
+        if isinstance(result, Exception):
+            logging.error(f"Index Upstream Error: {result}")
+
     try:
-        # Auto-load latest available data
-        today = datetime.date.today()
-        target_date = adjust_for_holidays(today)
-        
-        # Generate Charts
-        charts = generate_advanced_charts(target_date)
-        
-        # Generate Activity Table Data
-        activity_data = get_latest_activity_data()
+        # Generate Charts and Activity Table Data (rendering runs in worker threads)
+        chart_html = await generate_advanced_charts(target_date)
+        activity_data = await get_latest_activity_data()
         
     except Exception as e:
         logging.error(f"Index Auto-Load Error: {e}")
-    
-    return render_template("index.html", charts=charts, activity_data=activity_data)
+
+    snapshot_id = None
+    if not isinstance(chain, Exception) and chain[0]:
+        _, spot_price, atm_strike, aggregates, snapshot_id = chain
+        chain_summary = {
+            "spot_price": spot_price,
+            "atm_strike": atm_strike,
+            "nearest": aggregates[0] if aggregates else None
+        }
+
+    async def render():
+        return await render_template("index.html", charts=chart_html, activity_data=activity_data,
+                                     chain_summary=chain_summary, plotly_js_url=charts.PLOTLY_JS_URL)
+
+    if not chart_html or not activity_data or not chain_summary:
+        # Partial page (NSE unavailable): don't let caches hold on to it
+        response = await make_response(await render())
+        response.headers["Cache-Control"] = "no-store"
+        return response
+
+    # Keyed on the latest participant OI date and the option chain snapshot shown on the page
+    data_date = datetime.datetime.strptime(activity_data["date"], "%d/%m/%Y").replace(tzinfo=IST)
+    last_modified = max(filter(None, (data_date, parse_snapshot_time(snapshot_id))))
+    etag = make_etag("dashboard", target_date.isoformat(), activity_data["date"], snapshot_id)
+    # The live spot price on the page goes stale as fast as the option chain
+    return await cached_page(etag, last_modified, OPTION_CHAIN_CACHE_CONTROL, render)
 
 
 
 @app.route("/option-chain")
-def option_chain_view():
+async def option_chain_view():
     try:
-        processed_data, spot_price, atm_strike = optionchain.get_option_chain_data()
+        processed_data, spot_price, atm_strike, aggregates, snapshot_id = await optionchain.get_option_chain_data()
         if processed_data:
-            return render_template("option_chain.html", data=processed_data, spot_price=spot_price, atm_strike=atm_strike)
+            async def render():
+                return await render_template("option_chain.html", data=processed_data, spot_price=spot_price,
+                                             atm_strike=atm_strike, aggregates=aggregates)
+
+            if not snapshot_id:
+                return await render()
+            etag = make_etag("option-chain", snapshot_id)
+            return await cached_page(etag, parse_snapshot_time(snapshot_id), OPTION_CHAIN_CACHE_CONTROL, render)
         else:
-            flash("Failed to fetch Option Chain data from NSE.", "error")
+            await flash("Failed to fetch Option Chain data from NSE.", "error")
             return redirect(url_for("index"))
     except Exception as e:
         logging.error(f"Error in option chain view: {e}")
-        flash(f"Error: {e}", "error")
+        await flash(f"Error: {e}", "error")
         return redirect(url_for("index"))
 
+@app.route("/export/participant-oi.<fmt>")
+async def export_participant_oi(fmt):
+    """
+    Stream parsed participant OI (with Call Diff / Put Diff / Net Sentiment)
+    for ?start=YYYY-MM-DD&end=YYYY-MM-DD as CSV, NDJSON or Arrow IPC.
+    Supports If-None-Match and 'Range: dates=START/END' for incremental pulls.
+    """
+    if fmt not in EXPORT_FORMATS:
+        return jsonify({"error": f"Unsupported format '{fmt}'. Use one of: {', '.join(EXPORT_FORMATS)}"}), 404
+    if fmt == "arrow" and not ARROW_AVAILABLE:
+        return jsonify({"error": "Arrow export requires pyarrow to be installed."}), 501
+
+    try:
+        end = datetime.date.fromisoformat(request.args["end"]) if "end" in request.args else datetime.date.today()
+        start = (datetime.date.fromisoformat(request.args["start"]) if "start" in request.args
+                 else end - datetime.timedelta(days=DEFAULT_EXPORT_DAYS))
+    except ValueError:
+        return jsonify({"error": "Dates must be in YYYY-MM-DD format."}), 400
+    if start > end:
+        return jsonify({"error": "start must not be after end."}), 400
+    if (end - start).days >= MAX_EXPORT_DAYS:
+        return jsonify({"error": f"Range is limited to {MAX_EXPORT_DAYS} days."}), 400
+
+    try:
+        last_day = await latest_published_day(start, end)
+    except RuntimeError as e:
+        # No validator: the client must not cache anything for this range yet
+        response = jsonify({"error": f"{e}; retry later."})
+        response.status_code = 503
+        response.headers["Retry-After"] = "60"
+        response.headers["Cache-Control"] = "no-store"
+        return response
+
+    etag = export_etag(fmt, start, end, last_day)
+    if request.if_none_match.contains_weak(etag):
+        response = Response(status=304)
+        response.set_etag(etag)
+        return response
+
+    status = 200
+    range_start, range_end = start, end
+    date_range = parse_dates_range(request.headers.get("Range"), start, end)
+    if date_range and (not request.if_range.etag or request.if_range.etag == etag):
+        range_start, range_end = date_range
+        if range_start > range_end:
+            response = jsonify({"error": "Requested date range is outside the export range."})
+            response.status_code = 416
+            response.headers["Content-Range"] = f"dates */{start.isoformat()}/{end.isoformat()}"
+            return response
+        status = 206
+
+    # The body stops at the latest published day the ETag describes
+    frames = iter_participant_oi(range_start, min(range_end, last_day or datetime.date.min))
+    response = Response(EXPORT_STREAMS[fmt](frames), status=status, mimetype=EXPORT_FORMATS[fmt])
+    # Long ranges stream for longer than Quart's default response timeout
+    response.timeout = None
+    response.set_etag(etag)
+    response.headers["Accept-Ranges"] = "dates"
+    response.headers["Cache-Control"] = "no-cache"
+    response.headers["Content-Disposition"] = (
+        f"attachment; filename=participant_oi_{range_start.isoformat()}_{range_end.isoformat()}.{fmt}"
+    )
+    if status == 206:
+        response.headers["Content-Range"] = f"dates {range_start.isoformat()}/{range_end.isoformat()}"
+    return response
+
 # ====================================================
 # 🚀 Run App
 # ====================================================
@@ -0,0 +1,215 @@
+"""
+Plotly chart producers for the dashboard.
+Each producer takes small input frames and returns a figure, so charts can be
+rendered one after another or in parallel across a process pool.
+"""
+import os
+import time
+import logging
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor, wait
+from concurrent.futures.process import BrokenProcessPool
+
+import pandas as pd
+import plotly.graph_objects as go
+from plotly.offline import get_plotlyjs_version
+from plotly.subplots import make_subplots
+
+# Common Layout Settings
+LAYOUT_ARGS = dict(
+    paper_bgcolor="rgba(0,0,0,0)",
+    plot_bgcolor="rgba(0,0,0,0)",
+    font_color="#888",
+    margin=dict(l=20, r=20, t=40, b=20)
+)
+
+# Pages include plotly.js once from this URL instead of once per fragment
+PLOTLY_JS_URL = f"https://cdn.plot.ly/plotly-{get_plotlyjs_version()}.min.js"
+
+HEATMAP_COLS = ["Future Index Long", "Future Index Short", "Option Index Call Long", "Option Index Put Long"]
+
+_render_pool = None
+_render_workers = 0
+
+def get_render_pool(jobs: int) -> ProcessPoolExecutor:
+    """
+    Lazily create the shared process pool used for parallel rendering.
+    Sized to the number of charts (or CHART_RENDER_WORKERS), since every
+    spawned worker re-imports the server's main module.
+    """
+    global _render_pool, _render_workers
+    if _render_pool is None:
+        _render_workers = int(os.getenv("CHART_RENDER_WORKERS", min(os.cpu_count() or 1, jobs)))
+        # spawn avoids forking a multi-threaded server process
+        _render_pool = ProcessPoolExecutor(max_workers=_render_workers,
+                                           mp_context=multiprocessing.get_context("spawn"))
+    return _render_pool
+
+def _worker_ready():
+    return os.getpid()
+
+def warm_render_pool(jobs: int):
+    """
+    Start every pool worker up front (e.g. at server startup), so the first
+    dashboard render doesn't pay for spawning processes and their imports.
+    """
+    pool = get_render_pool(jobs)
+    wait([pool.submit(_worker_ready) for _ in range(_render_workers)])
+
+def shutdown_render_pool():
+    global _render_pool
+    if _render_pool is not None:
+        _render_pool.shutdown(cancel_futures=True)
+        _render_pool = None
+
+# ====================================================
+# 📈 Chart Producers
+# ====================================================
+def get_colors(values):
+    """Light Green / Light Red cell colors by sign."""
+    return ['#86efac' if v >= 0 else '#fca5a5' for v in values]
+
+def diff_table(step8_df):
+    """Step 8: Call Diff vs Put Diff table."""
+    fig = go.Figure(data=[go.Table(
+        header=dict(values=["Client Type", "Call Diff (Long-Short)", "Put Diff (Long-Short)"],
+                    fill_color='#d1d5db', align='center', font=dict(color='black', size=12)),
+        cells=dict(values=[step8_df["Client Type"], step8_df["Call Diff"], step8_df["Put Diff"]],
+                   fill_color=[['#f3f4f6']*len(step8_df), get_colors(step8_df["Call Diff"]), get_colors(step8_df["Put Diff"])],
+                   align='center', font=dict(color='black', size=11))
+    )])
+    fig.update_layout(title="Call & Put Diff per Client", margin=dict(l=0, r=0, t=30, b=0))
+    return fig
+
+def net_sentiment_table(step8_df):
+    """Step 8: Net Sentiment table."""
+    fig = go.Figure(data=[go.Table(
+        header=dict(values=["Client Type", "Call-Put Diff (Call-Put)"],
+                    fill_color='#d1d5db', align='center', font=dict(color='black', size=12)),
+        cells=dict(values=[step8_df["Client Type"], step8_df["Net Sentiment"]],
+                   fill_color=[['#f3f4f6']*len(step8_df), get_colors(step8_df["Net Sentiment"])],
+                   align='center', font=dict(color='black', size=11))
+    )])
+    fig.update_layout(title="Net Sentiment Diff", margin=dict(l=0, r=0, t=30, b=0))
+    return fig
+
+def diff_side_by_side(step8_df):
+    """Step 8: Side-by-side Call Diff / Put Diff bars."""
+    fig = make_subplots(rows=1, cols=2, subplot_titles=("Call Diff", "Put Diff"))
+
+    colors_call = ['#059669' if v >= 0 else '#dc2626' for v in step8_df["Call Diff"]]
+    fig.add_trace(go.Bar(x=step8_df["Client Type"], y=step8_df["Call Diff"], marker_color=colors_call, name="Call Diff"), row=1, col=1)
+
+    colors_put = ['#059669' if v >= 0 else '#dc2626' for v in step8_df["Put Diff"]]
+    fig.add_trace(go.Bar(x=step8_df["Client Type"], y=step8_df["Put Diff"], marker_color=colors_put, name="Put Diff"), row=1, col=2)
+
+    fig.update_layout(title="Call & Put Diff per Client Type", showlegend=False, **LAYOUT_ARGS)
+    return fig
+
+def position_heatmap(heatmap_data):
+    """Position Intensity Heatmap (moved from Compare)."""
+    fig = go.Figure(data=go.Heatmap(
+        z=heatmap_data.values,
+        x=heatmap_data.columns,
+        y=heatmap_data.index,
+        colorscale='Viridis',
+        text=heatmap_data.values,
+        texttemplate='%{text:,.0f}',
+        textfont={"size": 12},
+        colorbar=dict(title="OI Value")
+    ))
+    fig.update_layout(
+        title=dict(text="Position Intensity Heatmap", font=dict(size=20, color='#3b82f6')),
+        **LAYOUT_ARGS,
+        height=500
+    )
+    return fig
+
+# ====================================================
+# 🖨️ Rendering
+# ====================================================
+def render_chart(key, producer, args):
+    """Build a figure and serialize it to an HTML fragment (runs in workers too)."""
+    fig = producer(*args)
+    # Fixed div_id keeps output identical between serial and parallel renders
+    return fig.to_html(include_plotlyjs=False, full_html=False, div_id=key)
+
+SNAPSHOT_CHARTS = 4
+
+def snapshot_jobs(today_df):
+    """
+    Render jobs for the dashboard's Market Snapshot: (key, producer, input frames).
+    today_df must already carry Call Diff / Put Diff / Net Sentiment.
+    """
+    heatmap_data = today_df.set_index("Client Type")[HEATMAP_COLS]
+
+    # --- Step 8 input: Custom Tables & Charts with TOTAL row ---
+    step8_df = today_df.copy()
+    numeric_cols = step8_df.select_dtypes(include='number').columns
+    total_row = step8_df[numeric_cols].sum()
+    total_row["Client Type"] = "TOTAL"
+    step8_df = pd.concat([step8_df, pd.DataFrame([total_row])], ignore_index=True)
+
+    # Only the charts index.html renders
+    return [
+        ('step8_table1', diff_table, (step8_df,)),
+        ('step8_table2', net_sentiment_table, (step8_df,)),
+        ('step8_charts', diff_side_by_side, (step8_df,)),
+        ('position_heat', position_heatmap, (heatmap_data,)),
+    ]
+
+def render_charts(jobs, mode="serial") -> dict:
+    """
+    Render a list of (key, producer, args) jobs to a dict of HTML strings.
+    In "process" mode producers run in parallel; only the input frames are
+    sent to workers and the HTML fragments come back.
+    """
+    if mode == "process" and len(jobs) > 1:
+        try:
+            pool = get_render_pool(len(jobs))
+            futures = [(key, pool.submit(render_chart, key, producer, args)) for key, producer, args in jobs]
+            return {key: future.result() for key, future in futures}
+        except (BrokenProcessPool, OSError) as e:
+            logging.warning(f"Parallel chart rendering failed ({e}); falling back to serial.")
+            global _render_pool
+            _render_pool = None
+
+    return {key: render_chart(key, producer, args) for key, producer, args in jobs}
+
+# ====================================================
+# ⏱️ Benchmark
+# ====================================================
+if __name__ == "__main__":
+    # Serial vs process-pool rendering of the snapshot charts: python charts.py
+    import numpy as np
+
+    rng = np.random.default_rng(0)
+    cols = ["Future Index Long", "Future Index Short", "Option Index Call Long", "Option Index Put Long",
+            "Option Index Call Short", "Option Index Put Short"]
+    df = pd.DataFrame({col: rng.integers(10_000, 500_000, 4) for col in cols})
+    df.insert(0, "Client Type", ["Client", "DII", "FII", "Pro"])
+    df["Call Diff"] = df["Option Index Call Long"] - df["Option Index Call Short"]
+    df["Put Diff"] = df["Option Index Put Long"] - df["Option Index Put Short"]
+    df["Net Sentiment"] = df["Call Diff"] - df["Put Diff"]
+    jobs = snapshot_jobs(df)
+
+    def timed(label, fn, runs=5):
+        timings = []
+        for _ in range(runs):
+            start = time.perf_counter()
+            result = fn()
+            timings.append(time.perf_counter() - start)
+        print(f"{label}: best {min(timings) * 1000:.1f} ms, mean {sum(timings) / runs * 1000:.1f} ms")
+        return result
+
+    per_chart = {key: timed(f"  {key}", lambda: render_chart(key, producer, args))
+                 for key, producer, args in jobs}
+    serial = timed("Serial", lambda: render_charts(jobs, "serial"))
+
+    start = time.perf_counter()
+    warm_render_pool(len(jobs))
+    print(f"Pool warm-up ({_render_workers} workers): {(time.perf_counter() - start) * 1000:.1f} ms")
+    parallel = timed("Process (warm)", lambda: render_charts(jobs, "process"))
+    shutdown_render_pool()
+
+    print(f"CPUs: {os.cpu_count()}; byte-identical: {serial == parallel}")
@@ -1,10 +1,22 @@
-import requests
+import asyncio
+import os
 import logging
+import datetime
+import numpy as np
 from storage import storage
+import greeks
+import upstream
 
-NSE_OPTION_CHAIN_URL = "https://www.nseindia.com/api/option-chain-indices?symbol=NIFTY"
+NSE_SYMBOL = "NIFTY"
+NSE_OPTION_CHAIN_URL = f"https://www.nseindia.com/api/option-chain-indices?symbol={NSE_SYMBOL}"
+# Contract lot size for GEX; NSE revises it periodically (65 from the Dec-2025 series)
+LOT_SIZE = int(os.getenv("NIFTY_LOT_SIZE", "65"))
 NSE_HOME_URL = "https://www.nseindia.com"
 STORAGE_KEY = "option_chain_state"
+TOP_K_OI = 3
+
+# Per-snapshot cache of chain Greeks + aggregates (keyed by NSE records timestamp)
+_analysis_cache = {}
 
 headers = {
     "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36",
@@ -23,31 +35,170 @@ def save_current_data(data):
     # Store with 24 hour expiration
     storage.set_json(STORAGE_KEY, data, ex=86400)
 
-def fetch_raw_data():
-    """Fetch raw option chain data from NSE."""
-    session = requests.Session()
-    session.headers.update(headers)
+async def fetch_raw_data():
+    """Fetch raw option chain data; concurrent callers share one NSE request."""
+    return await upstream.coalesce("option-chain", fetch_option_chain)
+
+async def fetch_option_chain():
+    """Fetch raw option chain data from NSE over the shared async connection pool."""
+    # NSE cookies live in the shared client's jar; only visit the home page when needed
+    if not upstream.get_client().cookies:
+        await upstream.get(NSE_HOME_URL, headers=headers)
+    resp = await upstream.get(NSE_OPTION_CHAIN_URL, headers=headers)
+    if resp is not None and resp.status_code in (401, 403):
+        await upstream.get(NSE_HOME_URL, headers=headers)
+        resp = await upstream.get(NSE_OPTION_CHAIN_URL, headers=headers)
+    if resp is None:
+        return None
     try:
-        # Visit home page to set cookies
-        session.get(NSE_HOME_URL, timeout=10)
-        # Fetch option chain data
-        resp = session.get(NSE_OPTION_CHAIN_URL, timeout=10)
         resp.raise_for_status()
         return resp.json()
     except Exception as e:
         logging.error(f"Error fetching option chain: {e}")
         return None
 
-def get_option_chain_data():
+def extract_leg(leg):
+    """Pick the fields we track from an NSE CE/PE record."""
+    return {
+        "OI": leg.get("openInterest", 0),
+        "ChangeInOI": leg.get("changeinOpenInterest", 0),
+        "Volume": leg.get("totalTradedVolume", 0),
+        "IV": leg.get("impliedVolatility", 0),
+        "LTP": leg.get("lastPrice", 0)
+    }
+
+def build_chain_rows(data):
+    """Rows (strike, expiry, CE, PE) for every expiry in NSE's records.data."""
+    return [{
+        "strikePrice": item["strikePrice"],
+        "expiryDate": item["expiryDate"],
+        "CE": extract_leg(item.get("CE", {})),
+        "PE": extract_leg(item.get("PE", {}))
+    } for item in data]
+
+def compute_max_pain(strikes, call_oi, put_oi):
+    """
+    Index of the strike at which total option-writer payout is lowest.
+    Uses prefix sums over sorted strikes, so it is O(n) after sorting.
+    """
+    strikes = np.asarray(strikes, dtype=float)
+    order = np.argsort(strikes)
+    k = strikes[order]
+    c = call_oi[order]
+    p = put_oi[order]
+
+    # Calls expire ITM for all strikes <= settlement price
+    call_oi_below = np.cumsum(c)
+    call_notional_below = np.cumsum(c * k)
+    call_payout = k * call_oi_below - call_notional_below
+
+    # Puts expire ITM for all strikes >= settlement price
+    put_oi_above = np.cumsum(p[::-1])[::-1]
+    put_notional_above = np.cumsum((p * k)[::-1])[::-1]
+    put_payout = put_notional_above - k * put_oi_above
+
+    return order[np.argmin(call_payout + put_payout)]
+
+def top_oi_strikes(strikes, oi, k=TOP_K_OI):
+    """Return the k strikes with the highest OI (OI walls), largest first."""
+    idx = np.argsort(-oi, kind="stable")[:k]
+    return [{"strike": strikes[i], "OI": int(oi[i])} for i in idx if oi[i] > 0]
+
+def expiry_sort_key(expiry):
+    """Sort key for NSE 'DD-Mon-YYYY' expiries; unparseable dates go last."""
+    try:
+        return datetime.datetime.strptime(expiry, "%d-%b-%Y").date()
+    except (TypeError, ValueError):
+        return datetime.date.max
+
+def compute_chain_aggregates(processed_rows, top_k=TOP_K_OI):
+    """
+    Compute per-expiry aggregates from processed option chain rows.
+    Returns a list of dicts (one per expiry, nearest expiry first) with
+    PCR by OI and volume, max pain and top-k call/put OI strikes.
+    """
+    by_expiry = {}
+    for row in processed_rows:
+        by_expiry.setdefault(row["expiryDate"], []).append(row)
+
+    aggregates = []
+    # NSE lists records.data by strike, so first appearance is not expiry order
+    for expiry in sorted(by_expiry, key=expiry_sort_key):
+        rows = by_expiry[expiry]
+        strikes = [r["strikePrice"] for r in rows]
+        call_oi = np.array([r["CE"]["OI"] for r in rows], dtype=float)
+        put_oi = np.array([r["PE"]["OI"] for r in rows], dtype=float)
+        call_vol = np.array([r["CE"]["Volume"] for r in rows], dtype=float)
+        put_vol = np.array([r["PE"]["Volume"] for r in rows], dtype=float)
+
+        total_call_oi = call_oi.sum()
+        total_put_oi = put_oi.sum()
+        gex = np.array([r.get("GEX", 0) for r in rows], dtype=float)
+        total_call_vol = call_vol.sum()
+        total_put_vol = put_vol.sum()
+
+        aggregates.append({
+            "expiryDate": expiry,
+            "totalCallOI": int(total_call_oi),
+            "totalPutOI": int(total_put_oi),
+            "pcrOI": round(total_put_oi / total_call_oi, 2) if total_call_oi else None,
+            "pcrVolume": round(total_put_vol / total_call_vol, 2) if total_call_vol else None,
+            "maxPain": strikes[compute_max_pain(strikes, call_oi, put_oi)],
+            "callWalls": top_oi_strikes(strikes, call_oi, top_k),
+            "putWalls": top_oi_strikes(strikes, put_oi, top_k),
+            "netGEX": int(gex.sum()),
+        })
+
+    return aggregates
+
+def get_chain_analysis(chain_rows, spot_price, snapshot_id=None):
+    """
+    Greeks and aggregates for the full chain, cached per snapshot so the IV
+    solve only runs when NSE publishes new data.
+    Returns: (aggregates, greeks_by_key) with keys (strikePrice, expiryDate).
+    """
+    if snapshot_id and snapshot_id in _analysis_cache:
+        return _analysis_cache[snapshot_id]
+
+    greeks.compute_chain_greeks(chain_rows, spot_price, LOT_SIZE)
+    aggregates = compute_chain_aggregates(chain_rows)
+    greeks_by_key = {
+        (row["strikePrice"], row["expiryDate"]): {
+            "greeksCE": row.get("greeksCE"),
+            "greeksPE": row.get("greeksPE"),
+            "GEX": row.get("GEX", 0)
+        }
+        for row in chain_rows
+    }
+
+    analysis = (aggregates, greeks_by_key)
+    if snapshot_id:
+        # Only the latest snapshot is worth keeping
+        _analysis_cache.clear()
+        _analysis_cache[snapshot_id] = analysis
+    return analysis
+
+async def get_option_chain_data(track_changes=True):
     """
     Fetch and process option chain data with difference tracking.
-    Returns: (processed_rows, spot_price, atm_strike)
+    The NSE call is awaited on the event loop; parsing, the IV solve and the
+    storage round-trips run in a worker thread so the loop stays free.
+    Returns: (processed_rows, spot_price, atm_strike, aggregates, snapshot_id)
+    """
+    raw_data = await fetch_raw_data()
+    return await asyncio.to_thread(process_option_chain, raw_data, track_changes)
+
+def process_option_chain(raw_data, track_changes=True):
+    """
+    Process raw NSE option chain JSON into rows with difference tracking.
+    With track_changes=False the stored snapshot is compared against but not
+    replaced, so read-only views don't reset the option chain page's diffs.
+    Returns: (processed_rows, spot_price, atm_strike, aggregates, snapshot_id)
     """
-    raw_data = fetch_raw_data()
     previous_data = load_previous_data()
     
     if not raw_data:
-        return [], 0, None
+        return [], 0, None, [], None
 
     records = raw_data.get("records", {})
     spot_price = records.get("underlyingValue", 0)
@@ -57,7 +208,7 @@ def get_option_chain_data():
     filtered_data = raw_data.get("filtered", {}).get("data", [])
     
     if not filtered_data:
-        return [], spot_price, None
+        return [], spot_price, None, [], None
 
     atm_strike = int(round(spot_price / 50) * 50) if spot_price else None
 
@@ -70,24 +221,8 @@ def get_option_chain_data():
         
         # Extract current values
         # PHP: $data['CE']['openInterest'] etc.
-        ce = item.get("CE", {})
-        pe = item.get("PE", {})
-        
-        curr_ce = {
-            "OI": ce.get("openInterest", 0),
-            "ChangeInOI": ce.get("changeinOpenInterest", 0),
-            "Volume": ce.get("totalTradedVolume", 0),
-            "IV": ce.get("impliedVolatility", 0),
-            "LTP": ce.get("lastPrice", 0)
-        }
-        
-        curr_pe = {
-            "OI": pe.get("openInterest", 0),
-            "ChangeInOI": pe.get("changeinOpenInterest", 0),
-            "Volume": pe.get("totalTradedVolume", 0),
-            "IV": pe.get("impliedVolatility", 0),
-            "LTP": pe.get("lastPrice", 0)
-        }
+        curr_ce = extract_leg(item.get("CE", {}))
+        curr_pe = extract_leg(item.get("PE", {}))
 
         # Get previous values (Keyed by Strike)
         # PHP: $previousCE = $_SESSION['previousData'][$strikePrice]['CE'] ?? ...
@@ -125,6 +260,14 @@ def get_option_chain_data():
         new_session_data[str(strike)] = {"CE": curr_ce, "PE": curr_pe}
 
     # Save current data as previous data for next time
-    save_current_data(new_session_data)
+    if track_changes:
+        save_current_data(new_session_data)
+
+    snapshot_id = records.get("timestamp")
+    # filtered.data only holds the nearest expiry; records.data has them all
+    chain_rows = build_chain_rows(records.get("data") or filtered_data)
+    aggregates, greeks_by_key = get_chain_analysis(chain_rows, spot_price, snapshot_id)
+    for row in processed_rows:
+        row.update(greeks_by_key.get((row["strikePrice"], row["expiryDate"]), {}))
 
-    return processed_rows, spot_price, atm_strike
+    return processed_rows, spot_price, atm_strike, aggregates, snapshot_id
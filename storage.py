@@ -5,6 +5,7 @@ Provides fallback to in-memory storage for local development.
 import os
 import json
 import logging
+import threading
 from typing import Optional, Dict, Any
 
 # Try to import redis, but don't fail if not available
@@ -24,31 +25,46 @@ class StorageClient:
     def __init__(self):
         self.redis_client = None
         self.use_redis = False
-        
-        # Check if we're on Vercel and Redis is configured
-        redis_url = os.getenv("REDIS_URL") or os.getenv("KV_URL")
-        
-        if redis_url and REDIS_AVAILABLE:
-            try:
-                self.redis_client = redis.from_url(
-                    redis_url,
-                    decode_responses=True,
-                    socket_connect_timeout=5,
-                    socket_timeout=5
-                )
-                # Test connection
-                self.redis_client.ping()
-                self.use_redis = True
-                logging.info("✅ Connected to Redis (Vercel KV)")
-            except Exception as e:
-                logging.warning(f"Failed to connect to Redis: {e}. Using in-memory storage.")
-                self.redis_client = None
-                self.use_redis = False
-        else:
-            logging.info("📦 Using in-memory storage (local development)")
+        self._connected = False
+        self._lock = threading.Lock()
+    
+    def _connect(self):
+        """
+        Connect on first use rather than at import, so processes that only
+        import this module (e.g. chart render workers) never open a connection.
+        """
+        if self._connected:
+            return
+        with self._lock:
+            if self._connected:
+                return
+
+            # Check if we're on Vercel and Redis is configured
+            redis_url = os.getenv("REDIS_URL") or os.getenv("KV_URL")
+
+            if redis_url and REDIS_AVAILABLE:
+                try:
+                    self.redis_client = redis.from_url(
+                        redis_url,
+                        decode_responses=True,
+                        socket_connect_timeout=5,
+                        socket_timeout=5
+                    )
+                    # Test connection
+                    self.redis_client.ping()
+                    self.use_redis = True
+                    logging.info("✅ Connected to Redis (Vercel KV)")
+                except Exception as e:
+                    logging.warning(f"Failed to connect to Redis: {e}. Using in-memory storage.")
+                    self.redis_client = None
+                    self.use_redis = False
+            else:
+                logging.info("📦 Using in-memory storage (local development)")
+            self._connected = True
     
     def get(self, key: str) -> Optional[str]:
         """Get value from storage."""
+        self._connect()
         try:
             if self.use_redis and self.redis_client:
                 return self.redis_client.get(key)
@@ -67,6 +83,7 @@ class StorageClient:
             value: Value to store (string)
             ex: Expiration time in seconds (optional)
         """
+        self._connect()
         try:
             if self.use_redis and self.redis_client:
                 self.redis_client.set(key, value, ex=ex)
@@ -100,6 +117,7 @@ class StorageClient:
     
     def delete(self, key: str) -> bool:
         """Delete key from storage."""
+        self._connect()
         try:
             if self.use_redis and self.redis_client:
                 self.redis_client.delete(key)
@@ -114,6 +132,7 @@ class StorageClient:
     
     def exists(self, key: str) -> bool:
         """Check if key exists in storage."""
+        self._connect()
         try:
             if self.use_redis and self.redis_client:
                 return bool(self.redis_client.exists(key))
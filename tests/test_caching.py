@@ -0,0 +1,108 @@
+import asyncio
+import gzip
+
+import pytest
+
+import app as dashboard
+import optionchain
+
+SNAPSHOT = "17-Oct-2025 15:30:00"
+
+
+@pytest.fixture
+def dashboard_data(monkeypatch):
+    """Stub the dashboard's data sources; state['snapshot'] / state['chain_error'] drive the chain."""
+    state = {"snapshot": SNAPSHOT, "chain_error": None}
+
+    async def prefetch(target_date):
+        return None
+
+    async def chain(track_changes=True):
+        if state["chain_error"]:
+            raise state["chain_error"]
+        aggregates = [{"expiryDate": "21-Oct-2025", "pcrOI": 1.1, "maxPain": 25000}]
+        return [{"strikePrice": 25000}], 25012.3, 25000, aggregates, state["snapshot"]
+
+    async def charts(target_date):
+        return {key: "<div>" + "chart " * 200 + "</div>"
+                for key in ("step8_table1", "step8_table2", "step8_charts", "position_heat")}
+
+    async def activity():
+        return {"date": "17/10/2025", "data": [], "overall_trend": "NEUTRAL", "overall_color": "gray"}
+
+    monkeypatch.setattr(dashboard, "prefetch_participant_oi", prefetch)
+    monkeypatch.setattr(optionchain, "get_option_chain_data", chain)
+    monkeypatch.setattr(dashboard, "generate_advanced_charts", charts)
+    monkeypatch.setattr(dashboard, "get_latest_activity_data", activity)
+    return state
+
+
+def fetch(path="/", headers=None, flashes=None):
+    async def run():
+        client = dashboard.app.test_client()
+        if flashes:
+            async with client.session_transaction() as session:
+                session["_flashes"] = flashes
+        response = await client.get(path, headers=headers)
+        return response, await response.get_data()
+    return asyncio.run(run())
+
+
+def test_matching_etag_or_date_returns_304(dashboard_data):
+    response, _ = fetch()
+    assert response.status_code == 200
+    assert response.headers["Cache-Control"] == dashboard.OPTION_CHAIN_CACHE_CONTROL
+    etag, last_modified = response.headers["ETag"], response.headers["Last-Modified"]
+
+    response, body = fetch(headers={"If-None-Match": etag})
+    assert response.status_code == 304
+    assert body == b""
+    assert fetch(headers={"If-Modified-Since": last_modified})[0].status_code == 304
+
+
+def test_new_chain_snapshot_invalidates_validators(dashboard_data):
+    response, _ = fetch()
+    etag, last_modified = response.headers["ETag"], response.headers["Last-Modified"]
+
+    dashboard_data["snapshot"] = "17-Oct-2025 15:31:00"
+    assert fetch(headers={"If-None-Match": etag})[0].status_code == 200
+    assert fetch(headers={"If-Modified-Since": last_modified})[0].status_code == 200
+
+
+def test_flash_and_partial_pages_are_not_stored(dashboard_data):
+    response, _ = fetch(flashes=[("error", "Failed to fetch Option Chain data from NSE.")])
+    assert response.headers["Cache-Control"] == "no-store"
+    assert "ETag" not in response.headers
+
+    dashboard_data["chain_error"] = RuntimeError("NSE unavailable")
+    response, _ = fetch()
+    assert response.headers["Cache-Control"] == "no-store"
+    assert "ETag" not in response.headers
+
+
+def test_gzip_negotiation_weakens_etag(dashboard_data):
+    plain, plain_body = fetch(headers={"Accept-Encoding": "identity"})
+    assert "Content-Encoding" not in plain.headers
+
+    response, body = fetch(headers={"Accept-Encoding": "gzip"})
+    assert response.headers["Content-Encoding"] == "gzip"
+    assert "Accept-Encoding" in response.headers["Vary"]
+    assert response.headers["ETag"].startswith('W/"')
+    assert gzip.decompress(body) == plain_body
+
+
+def test_brotli_preferred_when_available(dashboard_data):
+    brotli = pytest.importorskip("brotli")
+    plain, plain_body = fetch(headers={"Accept-Encoding": "identity"})
+
+    response, body = fetch(headers={"Accept-Encoding": "gzip, br"})
+    assert response.headers["Content-Encoding"] == "br"
+    assert brotli.decompress(body) == plain_body
+
+
+def test_etag_salt_is_stable_and_follows_the_deploy(monkeypatch):
+    monkeypatch.delenv("VERCEL_GIT_COMMIT_SHA", raising=False)
+    assert dashboard.compute_etag_salt() == dashboard.compute_etag_salt()
+
+    monkeypatch.setenv("VERCEL_GIT_COMMIT_SHA", "abc123")
+    assert dashboard.compute_etag_salt() == "abc123"
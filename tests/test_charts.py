@@ -0,0 +1,38 @@
+import pandas as pd
+import pytest
+
+import app as dashboard
+import charts
+
+
+@pytest.fixture
+def snapshot_df():
+    df = pd.DataFrame({
+        "Client Type": ["Client", "DII", "FII", "Pro"],
+        "Future Index Long": [410, 120, 230, 90],
+        "Future Index Short": [380, 140, 210, 95],
+        "Option Index Call Long": [900, 10, 450, 300],
+        "Option Index Put Long": [870, 60, 500, 280],
+        "Option Index Call Short": [880, 0, 470, 310],
+        "Option Index Put Short": [910, 0, 430, 290],
+    })
+    return dashboard.calculate_net_sentiment(df)
+
+
+def test_snapshot_renders_only_template_charts(snapshot_df):
+    rendered = charts.render_charts(charts.snapshot_jobs(snapshot_df), mode="serial")
+
+    assert sorted(rendered) == ["position_heat", "step8_charts", "step8_table1", "step8_table2"]
+    assert len(rendered) == charts.SNAPSHOT_CHARTS
+    assert all(f'id="{key}"' in html for key, html in rendered.items())
+
+
+def test_process_pool_output_is_byte_identical_to_serial(snapshot_df):
+    jobs = charts.snapshot_jobs(snapshot_df)
+    try:
+        charts.warm_render_pool(len(jobs))
+        parallel = charts.render_charts(jobs, mode="process")
+    finally:
+        charts.shutdown_render_pool()
+
+    assert parallel == charts.render_charts(jobs, mode="serial")
@@ -0,0 +1,124 @@
+import asyncio
+import io
+import json
+import time
+
+import httpx
+import pytest
+
+import app as dashboard
+import upstream
+
+CSV = (
+    "Participant wise Open Interest\n"
+    "Client Type,Future Index Long,Future Index Short,Future Stock Long,Future Stock Short,"
+    "Option Index Call Long,Option Index Put Long,Option Index Call Short,Option Index Put Short\n"
+    "Client,100,200,300,400,500,600,700,800\n"
+    "DII,110,210,310,410,510,610,710,810\n"
+    "FII,120,220,320,420,520,620,720,820\n"
+    "Pro,130,230,330,430,530,630,730,830\n"
+)
+# Mon 13 - Fri 17 Oct 2025, no NSE holidays in between
+PUBLISHED = ["13102025", "14102025", "15102025", "16102025"]
+EXPORT = "/export/participant-oi.{}?start=2025-10-13&end=2025-10-17"
+
+
+@pytest.fixture
+def nse(monkeypatch):
+    """Fake NSE archive: date string -> CSV text, HTTP status, or None for a network error."""
+    archive = {date_str: CSV for date_str in PUBLISHED}
+
+    async def fake_get(url, headers=None):
+        outcome = archive.get(url.rsplit("_", 1)[-1].split(".")[0], 404)
+        if outcome is None:
+            return None
+        if isinstance(outcome, int):
+            return httpx.Response(outcome)
+        return httpx.Response(200, text=outcome)
+
+    monkeypatch.setattr(upstream, "get", fake_get)
+    monkeypatch.setattr(dashboard, "_csv_cache", {})
+    monkeypatch.setattr(dashboard, "_csv_missing", {})
+    return archive
+
+
+def fetch(path, headers=None):
+    async def run():
+        response = await dashboard.app.test_client().get(path, headers=headers)
+        return response, await response.get_data()
+    return asyncio.run(run())
+
+
+def test_csv_export_streams_published_days_without_caching(nse):
+    response, body = fetch(EXPORT.format("csv"))
+
+    assert response.status_code == 200
+    assert response.headers["ETag"]
+    lines = body.decode().strip().splitlines()
+    assert lines[0].startswith("Date,Client Type")
+    assert sorted({line.split(",")[0] for line in lines[1:]}) == [
+        "2025-10-13", "2025-10-14", "2025-10-15", "2025-10-16"
+    ]
+    assert dashboard._csv_cache == {}
+
+
+def test_ndjson_and_arrow_exports_match_csv(nse):
+    _, body = fetch(EXPORT.format("ndjson"))
+    records = [json.loads(line) for line in body.decode().splitlines()]
+    assert len(records) == 16
+    assert records[0]["Net Sentiment"] == (500 - 700) - (600 - 800)
+
+    pa = pytest.importorskip("pyarrow")
+    _, body = fetch(EXPORT.format("arrow"))
+    table = pa.ipc.open_stream(io.BytesIO(body)).read_all()
+    assert table.num_rows == 16
+    assert table.column_names == dashboard.EXPORT_COLUMNS
+
+
+def test_unknown_format_is_404(nse):
+    response, _ = fetch(EXPORT.format("xlsx"))
+    assert response.status_code == 404
+
+
+def test_weak_if_none_match_returns_304_until_a_new_day_is_published(nse):
+    response, _ = fetch(EXPORT.format("csv"))
+    etag = response.headers["ETag"]
+
+    response, body = fetch(EXPORT.format("csv"), {"If-None-Match": f"W/{etag}"})
+    assert response.status_code == 304
+    assert body == b""
+
+    nse["17102025"] = CSV
+    dashboard._csv_missing.clear()
+    response, _ = fetch(EXPORT.format("csv"), {"If-None-Match": etag})
+    assert response.status_code == 200
+    assert response.headers["ETag"] != etag
+
+
+def test_dates_range_returns_206_or_416(nse):
+    response, body = fetch(EXPORT.format("csv"), {"Range": "dates=2025-10-15/"})
+    assert response.status_code == 206
+    assert response.headers["Content-Range"] == "dates 2025-10-15/2025-10-17"
+    assert sorted({line.split(",")[0] for line in body.decode().strip().splitlines()[1:]}) == [
+        "2025-10-15", "2025-10-16"
+    ]
+
+    response, _ = fetch(EXPORT.format("csv"), {"Range": "dates=2025-11-01/"})
+    assert response.status_code == 416
+
+
+def test_unfetchable_latest_day_is_503_without_etag(nse):
+    nse["17102025"] = None
+    # A 404 recorded before MISSING_CSV_TTL expired no longer counts as "not published"
+    dashboard._csv_missing["17102025"] = time.time() - dashboard.MISSING_CSV_TTL - 1
+
+    response, _ = fetch(EXPORT.format("csv"))
+    assert response.status_code == 503
+    assert "ETag" not in response.headers
+    assert response.headers["Cache-Control"] == "no-store"
+
+
+def test_day_failing_mid_stream_aborts_the_export(nse):
+    nse["14102025"] = 503
+    with pytest.raises(RuntimeError, match="2025-10-14"):
+        fetch(EXPORT.format("csv"))
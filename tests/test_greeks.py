@@ -0,0 +1,44 @@
+import datetime
+
+import numpy as np
+
+import greeks
+
+
+def test_implied_volatility_round_trip_near_atm():
+    spot = 25000.0
+    strikes = np.arange(23500, 26501, 50, dtype=float)
+    for days in (3, 8, 30, 90):
+        T = days / 365.0
+        sigma = 0.11 + 0.08 * ((strikes - spot) / spot) ** 2 * 100
+        for is_call in (True, False):
+            prices = greeks.bs_price(spot, strikes, T, greeks.RISK_FREE_RATE, sigma, is_call)
+            solved = greeks.implied_volatility(prices, spot, strikes, T, greeks.RISK_FREE_RATE, is_call)
+
+            assert not np.isnan(solved).any()
+            np.testing.assert_allclose(solved, sigma, atol=1e-5)
+
+
+def test_implied_volatility_rejects_prices_outside_bounds():
+    spot, T = 25000.0, 30 / 365.0
+    # Below intrinsic, zero premium and above the spot price are all unsolvable
+    prices = np.array([900.0, 0.0, 30000.0])
+    strikes = np.array([24000.0, 26000.0, 25000.0])
+
+    solved = greeks.implied_volatility(prices, spot, strikes, T, greeks.RISK_FREE_RATE, True)
+    assert np.isnan(solved).all()
+
+
+def test_chain_greeks_fall_back_to_nse_iv():
+    expiry = datetime.date.today() + datetime.timedelta(days=30)
+    rows = [{
+        "strikePrice": 25000,
+        "expiryDate": expiry.strftime("%d-%b-%Y"),
+        "CE": {"OI": 10, "IV": 0, "LTP": 0},
+        "PE": {"OI": 10, "IV": 14.5, "LTP": 0},
+    }]
+    greeks.compute_chain_greeks(rows, 25000.0, lot_size=65)
+
+    assert rows[0]["greeksCE"]["IV"] is None
+    assert rows[0]["greeksPE"]["IV"] == 14.5
+    assert -1 < rows[0]["greeksPE"]["Delta"] < 0
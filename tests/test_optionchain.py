@@ -0,0 +1,59 @@
+import numpy as np
+
+import optionchain
+
+
+def brute_force_max_pain(strikes, call_oi, put_oi):
+    """Reference O(n^2) scan: writer payout at every candidate settlement strike."""
+    payouts = [
+        sum(c * max(s - k, 0) + p * max(k - s, 0) for k, c, p in zip(strikes, call_oi, put_oi))
+        for s in strikes
+    ]
+    return strikes[int(np.argmin(payouts))]
+
+
+def test_max_pain_matches_brute_force():
+    rng = np.random.default_rng(42)
+    for _ in range(200):
+        n = int(rng.integers(1, 60))
+        strikes = list(rng.permutation(np.arange(20000, 20000 + 50 * n, 50)))
+        call_oi = rng.integers(0, 100000, n).astype(float)
+        put_oi = rng.integers(0, 100000, n).astype(float)
+
+        idx = optionchain.compute_max_pain(strikes, call_oi, put_oi)
+        assert strikes[idx] == brute_force_max_pain(strikes, call_oi, put_oi)
+
+
+def test_aggregates_cover_every_expiry():
+    data = [
+        {"strikePrice": k, "expiryDate": expiry,
+         "CE": {"openInterest": 10, "totalTradedVolume": 4},
+         "PE": {"openInterest": 20, "totalTradedVolume": 2}}
+        for expiry in ("21-Oct-2025", "28-Oct-2025")
+        for k in (24900, 25000, 25100)
+    ]
+    aggregates = optionchain.compute_chain_aggregates(optionchain.build_chain_rows(data))
+
+    assert [a["expiryDate"] for a in aggregates] == ["21-Oct-2025", "28-Oct-2025"]
+    assert all(a["pcrOI"] == 2.0 and a["pcrVolume"] == 0.5 for a in aggregates)
+
+
+def test_aggregates_sorted_by_expiry_for_strike_major_chain():
+    # NSE sorts records.data by strike, so a far expiry listing the lowest strike comes first
+    data = [
+        {"strikePrice": 20000, "expiryDate": "26-May-2026",
+         "CE": {"openInterest": 5, "totalTradedVolume": 1},
+         "PE": {"openInterest": 5, "totalTradedVolume": 1}},
+    ] + [
+        {"strikePrice": k, "expiryDate": expiry,
+         "CE": {"openInterest": 10, "totalTradedVolume": 4},
+         "PE": {"openInterest": 20, "totalTradedVolume": 2}}
+        for k in (24900, 25000, 25100)
+        for expiry in ("30-Dec-2025", "21-Oct-2025", "28-Oct-2025")
+    ]
+    aggregates = optionchain.compute_chain_aggregates(optionchain.build_chain_rows(data))
+
+    assert [a["expiryDate"] for a in aggregates] == [
+        "21-Oct-2025", "28-Oct-2025", "30-Dec-2025", "26-May-2026"
+    ]
+    assert aggregates[-1]["maxPain"] == 20000
@@ -0,0 +1,59 @@
+"""
+Shared asyncio I/O for NSE requests.
+One pooled httpx.AsyncClient per event loop, so every in-flight request on
+the ASGI server's loop multiplexes its upstream calls over the same
+kept-alive connections while it waits on NSE.
+"""
+import asyncio
+import logging
+from typing import Awaitable, Callable, Dict, Hashable, Optional
+
+import httpx
+
+REQUEST_TIMEOUT = 10
+POOL_LIMITS = httpx.Limits(max_connections=50, max_keepalive_connections=20)
+
+_client: Optional[httpx.AsyncClient] = None
+_client_loop: Optional[asyncio.AbstractEventLoop] = None
+
+# In-flight upstream calls, keyed by what they fetch
+_inflight: Dict[Hashable, asyncio.Task] = {}
+
+def get_client() -> httpx.AsyncClient:
+    """Shared client (connection pool + cookie jar) for the running event loop."""
+    global _client, _client_loop
+    loop = asyncio.get_running_loop()
+    if _client is None or _client_loop is not loop:
+        # httpx connections are bound to the loop that opened them
+        _client = httpx.AsyncClient(timeout=REQUEST_TIMEOUT, limits=POOL_LIMITS, follow_redirects=True)
+        _client_loop = loop
+    return _client
+
+async def close_client():
+    """Close the shared client (called when the server shuts down)."""
+    global _client, _client_loop
+    if _client is not None:
+        await _client.aclose()
+    _client = None
+    _client_loop = None
+
+async def coalesce(key: Hashable, fetch: Callable[[], Awaitable]):
+    """
+    Share one in-flight fetch() among concurrent callers with the same key, so a
+    burst of requests for the same NSE resource costs one upstream round-trip.
+    """
+    task = _inflight.get(key)
+    if task is None or task.get_loop() is not asyncio.get_running_loop():
+        task = asyncio.ensure_future(fetch())
+        _inflight[key] = task
+        task.add_done_callback(lambda done: _inflight.pop(key, None) if _inflight.get(key) is done else None)
+    # A cancelled caller must not cancel the fetch the others are waiting on
+    return await asyncio.shield(task)
+
+async def get(url: str, headers: Optional[dict] = None) -> Optional[httpx.Response]:
+    """GET a URL with the shared client. Returns None on network errors."""
+    try:
+        return await get_client().get(url, headers=headers)
+    except httpx.HTTPError as e:
+        logging.error(f"Error fetching {url}: {e}")
+        return None